@@ -1,21 +1,46 @@
 from __future__ import annotations
 
+import asyncio
 import datetime as dt
+import hashlib
 import socket
 import time
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from typing import Any
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urlunparse
+from zoneinfo import ZoneInfo
 
 import httpx
+import orjson
 
-from .config import CHECK_RETRIES, CHECK_TIMEOUT_SECONDS, TIMEZONE
+from .config import CHECK_CONCURRENCY, CHECK_RETRIES, CHECK_TIMEOUT_SECONDS, TIMEZONE
 from .redtrack import RedTrackClient
 from .log import log, debug
+from .meta_cache import load_meta_cache, save_meta_cache
 from .url_utils import add_sub5_test
 
+# Monotonic clock for probe timings (immune to wall-clock jumps).
+_pcn = time.perf_counter_ns
 
-@dataclass
+# Max URL probes in flight at once during a run.
+_CHECK_CONCURRENCY = CHECK_CONCURRENCY
+# Max RedTrack metadata calls in flight at once during a run.
+_REDTRACK_CONCURRENCY = 10
+
+_USER_AGENT = "Mozilla/5.0 (Linux; Android 16; SM-A156U Build/BP2A.250605.031.A3; wv) AppleWebKit/537.36 (KHTML, like Gecko) Version/4.0 Chrome/145.0.7632.104 Mobile Safari/537.36 [FB_IAB/FB4A;FBAV/549.0.0.61.62;IABMV/1;]"
+_HTTP_HEADERS = {"User-Agent": _USER_AGENT}
+
+# Campaigns trickle in at the RedTrack rate limit (a few seconds apart), so keep idle
+# connections around long enough for later campaigns on the same host to reuse them.
+_HTTP_LIMITS = httpx.Limits(
+    max_connections=2 * _CHECK_CONCURRENCY,
+    max_keepalive_connections=max(20, _CHECK_CONCURRENCY // 2),
+    keepalive_expiry=300,
+)
+
+
+@dataclass(slots=True)
 class UrlCheck:
     ok: bool
     failure_type: str | None = None
@@ -26,7 +51,27 @@ class UrlCheck:
     elapsed_ms: int | None = None
 
 
-def _pick_number(d: dict[str, Any], keys: list[str]) -> float | None:
+def _to_dict(u: UrlCheck) -> dict[str, Any]:
+    # Unset (None) fields are omitted: every consumer reads rows with .get(), and most rows
+    # are successes with half the fields empty, so this keeps stored runs noticeably smaller.
+    return {k: v for k in UrlCheck.__slots__ if (v := getattr(u, k)) is not None}
+
+
+# Candidate keys (in priority order) for fields whose name varies across RedTrack payloads.
+_TRACKING_URL_KEYS = ("trackback_url", "impression_url", "campaign_url", "url", "tracking_url")
+_DOMAIN_NAME_KEYS = ("name", "domain", "title", "hostname")
+_CID_KEYS = ("campaign_id", "id", "campaign", "campaignId")
+_UPDATED_KEYS = ("updated_at", "updatedAt", "updated", "modified_at", "date_updated")
+_COST_KEYS = ("cost", "spend", "total_cost", "totalCost")
+_REVENUE_KEYS = ("revenue", "rev", "total_revenue", "totalRevenue")
+_CLICK_KEYS = (
+    "clicks", "total_clicks", "totalClicks",
+    "lp_clicks", "lpClicks", "lp_views", "lpViews",
+    "ts_clicks", "click",
+)
+
+
+def _pick_number(d: dict[str, Any], keys: tuple[str, ...]) -> float | None:
     for k in keys:
         v = d.get(k)
         if v is None:
@@ -38,7 +83,7 @@ def _pick_number(d: dict[str, Any], keys: list[str]) -> float | None:
     return None
 
 
-def _pick_str(d: dict[str, Any], keys: list[str]) -> str | None:
+def _pick_str(d: dict[str, Any], keys: tuple[str, ...]) -> str | None:
     for k in keys:
         v = d.get(k)
         if isinstance(v, str) and v.strip():
@@ -46,34 +91,121 @@ def _pick_str(d: dict[str, Any], keys: list[str]) -> str | None:
     return None
 
 
-def dns_check(hostname: str) -> tuple[bool, str | None]:
-    try:
-        socket.getaddrinfo(hostname, 80)
+def _http_transport() -> httpx.AsyncHTTPTransport:
+    """Connection pool shared by every probe (and retry) in a run.
+
+    Transports are bound to the event loop they first connect on, so one is created per
+    run_full_check call rather than once per process. HTTP/2 lets concurrent probes to the
+    same host share one connection; HTTP/1.1-only servers are unaffected.
+    """
+    return httpx.AsyncHTTPTransport(limits=_HTTP_LIMITS, http2=True)
+
+
+# Campaign metadata cached on disk is reused while the campaign's list entry is unchanged.
+# The list entry may not reflect every stream/landing edit, so entries also expire; manual
+# and bot runs skip the cache entirely.
+_CAMPAIGN_CACHE_TTL_SECONDS = 3600
+# Domain names and landing URLs behind an id change even more rarely.
+_LOOKUP_CACHE_TTL_SECONDS = 3600
+
+# canonical url -> (time.monotonic(), result) of the last *successful* probe. Lets campaigns
+# sharing a domain/landing skip re-probing it within a run and across back-to-back runs.
+_URL_RESULT_CACHE: dict[str, tuple[float, UrlCheck]] = {}
+_URL_RESULT_CACHE_TTL_SECONDS = 900
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# A landing page whose HTML has fewer visible characters than this counts as not loaded.
+# At most _MAX_BODY_PREFIX_BYTES of the body are read to decide.
+_MIN_HTML_CHARS = 200
+_MAX_BODY_PREFIX_BYTES = 64 * 1024
+
+# Check kinds that only need to prove the URL is up; their page body isn't validated.
+_LIVENESS_KINDS = frozenset({"tracking", "domain_https", "domain_http"})
+
+# hostname -> time.monotonic() of the last successful lookup. Only successes are cached so a
+# transient resolver error never sticks around for later checks/runs.
+_DNS_CACHE: dict[str, float] = {}
+_DNS_CACHE_TTL_SECONDS = 300
+# Lookups get their own threads: the loop's default executor also runs the RedTrack calls,
+# which can sit blocked in the RPM limiter and would otherwise starve DNS (and so the probes).
+_DNS_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="dns")
+
+
+async def dns_check(hostname: str) -> tuple[bool, str | None]:
+    resolved_at = _DNS_CACHE.get(hostname)
+    if resolved_at is not None and time.monotonic() - resolved_at < _DNS_CACHE_TTL_SECONDS:
         return True, None
+    try:
+        await asyncio.get_running_loop().run_in_executor(_DNS_EXECUTOR, socket.getaddrinfo, hostname, 80)
     except socket.gaierror as e:
         return False, str(e)
     except Exception as e:
         return False, str(e)
+    _DNS_CACHE[hostname] = time.monotonic()
+    return True, None
 
 
-def http_check(url: str, timeout_s: int = CHECK_TIMEOUT_SECONDS) -> UrlCheck:
+async def _read_text_prefix(r: httpx.Response, min_chars: int) -> str:
+    """Decode just enough of a streamed body to see min_chars non-blank characters."""
+    buf = bytearray()
+    txt = ""
+    encoding = r.charset_encoding or "utf-8"
+    async for chunk in r.aiter_bytes():
+        buf += chunk
+        try:
+            txt = buf.decode(encoding, errors="replace")
+        except LookupError:
+            # unknown charset in the header
+            txt = buf.decode("utf-8", errors="replace")
+        if len(txt.strip()) >= min_chars or len(buf) >= _MAX_BODY_PREFIX_BYTES:
+            break
+    return txt
+
+
+async def http_check(
+    transport: httpx.AsyncBaseTransport,
+    url: str,
+    timeout_s: int = CHECK_TIMEOUT_SECONDS,
+    *,
+    validate_body: bool = True,
+) -> UrlCheck:
     # Add sub5=test to bypass cloaking, use mobile UA to simulate real user
     check_url = add_sub5_test(url) or url
     tested = url
-    start = time.time()
+    start = _pcn()
     try:
-        with httpx.Client(follow_redirects=True, timeout=timeout_s, headers={"User-Agent": "Mozilla/5.0 (Linux; Android 16; SM-A156U Build/BP2A.250605.031.A3; wv) AppleWebKit/537.36 (KHTML, like Gecko) Version/4.0 Chrome/145.0.7632.104 Mobile Safari/537.36 [FB_IAB/FB4A;FBAV/549.0.0.61.62;IABMV/1;]"}) as client:
-            r = client.get(check_url)
-        elapsed_ms = int((time.time() - start) * 1000)
-        ok = 200 <= r.status_code < 400
-
-        # basic "loaded" heuristic: HTML should have some body.
-        content_ok = True
-        ctype = (r.headers.get("content-type") or "").lower()
-        if "text/html" in ctype:
-            txt = r.text or ""
-            if len(txt.strip()) < 200:
-                content_ok = False
+        # Throwaway client per check so cookies never leak between checks (each one is a fresh
+        # visitor); the shared transport underneath keeps connections pooled for the whole run.
+        client = httpx.AsyncClient(transport=transport, follow_redirects=True, timeout=timeout_s, headers=_HTTP_HEADERS)
+
+        if not validate_body:
+            # Liveness only: a successful HEAD is enough. Anything else (405/501, other errors,
+            # servers that mishandle HEAD) is confirmed with a real GET before we report it.
+            try:
+                r = await client.head(check_url)
+                if 200 <= r.status_code < 400:
+                    elapsed_ms = (_pcn() - start) // 1_000_000
+                    return UrlCheck(ok=True, tested_url=tested, final_url=str(r.url), http_status=r.status_code, elapsed_ms=elapsed_ms)
+                debug("checker.head.fallback", url=url, status=r.status_code)
+            except httpx.TimeoutException:
+                raise
+            except httpx.RequestError as e:
+                debug("checker.head.fallback", url=url, error=str(e))
+
+        # Streamed so we only download as much body as the check actually needs.
+        async with client.stream("GET", check_url) as r:
+            ok = 200 <= r.status_code < 400
+
+            # basic "loaded" heuristic: HTML should have some body.
+            content_ok = True
+            ctype = (r.headers.get("content-type") or "").lower()
+            if validate_body and "text/html" in ctype:
+                txt = await _read_text_prefix(r, _MIN_HTML_CHARS)
+                if len(txt.strip()) < _MIN_HTML_CHARS:
+                    content_ok = False
+        elapsed_ms = (_pcn() - start) // 1_000_000
+        debug("checker.http.response", url=url, status=r.status_code, http_version=r.http_version)
 
         if ok and content_ok:
             return UrlCheck(ok=True, tested_url=tested, final_url=str(r.url), http_status=r.status_code, elapsed_ms=elapsed_ms)
@@ -82,23 +214,117 @@ def http_check(url: str, timeout_s: int = CHECK_TIMEOUT_SECONDS) -> UrlCheck:
         return UrlCheck(ok=False, failure_type="http", message=msg, tested_url=tested, final_url=str(r.url), http_status=r.status_code, elapsed_ms=elapsed_ms)
 
     except httpx.TimeoutException:
-        elapsed_ms = int((time.time() - start) * 1000)
+        elapsed_ms = (_pcn() - start) // 1_000_000
         return UrlCheck(ok=False, failure_type="timeout", message="timeout", tested_url=tested, elapsed_ms=elapsed_ms)
     except httpx.RequestError as e:
-        elapsed_ms = int((time.time() - start) * 1000)
+        elapsed_ms = (_pcn() - start) // 1_000_000
         return UrlCheck(ok=False, failure_type="http", message=str(e), tested_url=tested, elapsed_ms=elapsed_ms)
     except Exception as e:
-        elapsed_ms = int((time.time() - start) * 1000)
+        elapsed_ms = (_pcn() - start) // 1_000_000
         return UrlCheck(ok=False, failure_type="other", message=str(e), tested_url=tested, elapsed_ms=elapsed_ms)
 
 
+@dataclass
+class _ProbeRun:
+    """URL-probe state shared by every campaign in one run."""
+
+    transport: httpx.AsyncBaseTransport
+    sem: asyncio.Semaphore
+    # probe key -> probe in progress/finished this run, so identical URLs are probed once.
+    inflight: dict[str, asyncio.Future[UrlCheck]] = field(default_factory=dict)
+
+
+def _url_key(url: str) -> str:
+    """Canonical form used to de-duplicate probes (lowercase host, no default port/trailing slash)."""
+    try:
+        p = urlparse(url)
+        host = (p.hostname or "").lower()
+        port = p.port
+    except ValueError:
+        return url
+    scheme = p.scheme.lower()
+    if port and port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    return urlunparse((scheme, host, p.path.rstrip("/"), p.params, p.query, ""))
+
+
+def _prune_url_cache() -> None:
+    now = time.monotonic()
+    for k, (ts, _) in list(_URL_RESULT_CACHE.items()):
+        if now - ts >= _URL_RESULT_CACHE_TTL_SECONDS:
+            _URL_RESULT_CACHE.pop(k, None)
+
+
+async def _probe_url(probe: _ProbeRun, key: str, url: str, *, validate_body: bool) -> UrlCheck:
+    async with probe.sem:
+        # DNS precheck if url has host
+        try:
+            host = urlparse(url).hostname
+        except Exception:
+            host = None
+        if host:
+            ok_dns, dns_msg = await dns_check(host)
+            if not ok_dns:
+                return UrlCheck(ok=False, failure_type="dns", message=dns_msg, tested_url=url)
+
+        best: UrlCheck | None = None
+        for attempt in range(CHECK_RETRIES + 1):
+            res = await http_check(probe.transport, url, validate_body=validate_body)
+            best = res
+            if res.ok:
+                break
+        if best is None:
+            return UrlCheck(ok=False, failure_type="other", message="unknown")
+        # Only successes are reused across runs; failures must be re-probed.
+        if best.ok:
+            _URL_RESULT_CACHE[key] = (time.monotonic(), best)
+        return best
+
+
+async def _check_url(probe: _ProbeRun, kind: str, url: str) -> dict[str, Any]:
+    validate_body = kind not in _LIVENESS_KINDS
+    # A liveness-only result must not stand in for a landing check of the same URL.
+    key = ("GET " if validate_body else "HEAD ") + _url_key(url)
+    hit = _URL_RESULT_CACHE.get(key)
+    if hit and time.monotonic() - hit[0] < _URL_RESULT_CACHE_TTL_SECONDS:
+        res = hit[1]
+    else:
+        fut = probe.inflight.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(_probe_url(probe, key, url, validate_body=validate_body))
+            probe.inflight[key] = fut
+        res = await fut
+    if res.tested_url is not None and res.tested_url != url:
+        res = replace(res, tested_url=url)
+    return {"kind": kind, **_to_dict(res)}
+
+
+async def _check_campaign(
+    probe: _ProbeRun,
+    entry: dict[str, Any],
+    urls_to_check: list[tuple[str, str]],
+    *,
+    target: int,
+    on_result: Any = None,
+) -> dict[str, Any]:
+    checks = await asyncio.gather(*(_check_url(probe, kind, url) for kind, url in urls_to_check))
+    entry["checks"] = list(checks)
+
+    if on_result and callable(on_result):
+        try:
+            on_result(entry, target)
+        except Exception:
+            pass
+    return entry
+
+
 def extract_urls_from_campaign(c: dict[str, Any]) -> dict[str, Any]:
     """Best-effort URL extraction.
 
     RedTrack campaign schema varies by configuration; we use the most common fields.
     """
-    tracking_url = _pick_str(c, ["trackback_url", "impression_url", "campaign_url", "url", "tracking_url"])
-    domain_id = _pick_str(c, ["domain_id"])
+    tracking_url = _pick_str(c, _TRACKING_URL_KEYS)
+    domain_id = _pick_str(c, ("domain_id",))
 
     landing_ids: set[str] = set()
     for cs in (c.get("streams") or []):
@@ -119,6 +345,27 @@ def extract_urls_from_campaign(c: dict[str, Any]) -> dict[str, Any]:
     }
 
 
+def _campaign_hash(c: dict[str, Any]) -> str:
+    """Cache key for a campaign's metadata: its last-modified stamp when the list entry has one
+    (stream/landing edits bump it), otherwise a hash of the whole entry."""
+    for k in _UPDATED_KEYS:
+        v = c.get(k)
+        if v not in (None, ""):
+            return f"{k}:{v}"
+    payload = orjson.dumps(c, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _fresh_entries(section: Any, ttl_s: int) -> dict[str, dict[str, Any]]:
+    """Entries of a meta-cache section that are younger than ttl_s."""
+    now = time.time()
+    return {
+        k: v
+        for k, v in (section or {}).items()
+        if isinstance(v, dict) and now - (v.get("ts") or 0) < ttl_s
+    }
+
+
 def compute_lookback_window(days_lookback: int) -> tuple[dt.date, dt.date]:
     # Use UTC dates; RedTrack also accepts timezone param.
     # We keep logic simple: last N calendar days.
@@ -128,27 +375,35 @@ def compute_lookback_window(days_lookback: int) -> tuple[dt.date, dt.date]:
     return date_from, date_to
 
 
+def _row_campaign_id(row: dict[str, Any]) -> str | None:
+    # campaign id can appear under different keys depending on grouping
+    for k in _CID_KEYS:
+        v = row.get(k)
+        if v is not None:
+            return str(v)
+    return None
+
+
 def filter_campaigns_with_activity(campaigns: list[dict[str, Any]], report_rows: list[dict[str, Any]]) -> dict[str, dict[str, float | None]]:
     """Return map campaign_id -> {cost_7d, revenue_7d} for campaigns with cost>0 or revenue>0."""
 
-    # Build id set for robustness.
-    ids = {str(c.get("id")) for c in campaigns if c.get("id") is not None}
+    # Build id set for robustness (one pass, one .get() per campaign).
+    ids: set[str] = set()
+    for c in campaigns:
+        cid = c.get("id")
+        if cid is not None:
+            ids.add(str(cid))
 
     out: dict[str, dict[str, float | None]] = {}
-    for row in report_rows or []:
-        # campaign id can appear under different keys depending on grouping
-        cid = None
-        for k in ["campaign_id", "id", "campaign", "campaignId"]:
-            if row.get(k) is not None:
-                cid = str(row.get(k))
-                break
+    for row in report_rows or ():
+        cid = _row_campaign_id(row)
         if not cid or cid not in ids:
             continue
 
-        cost = _pick_number(row, ["cost", "spend", "total_cost", "totalCost"]) or 0.0
-        rev = _pick_number(row, ["revenue", "rev", "total_revenue", "totalRevenue"]) or 0.0
+        cost = _pick_number(row, _COST_KEYS) or 0.0
+        rev = _pick_number(row, _REVENUE_KEYS) or 0.0
         if cost > 0 or rev > 0:
-            out[cid] = {"cost_7d": float(cost), "revenue_7d": float(rev)}
+            out[cid] = {"cost_7d": cost, "revenue_7d": rev}
 
     return out
 
@@ -156,7 +411,6 @@ def filter_campaigns_with_activity(campaigns: list[dict[str, Any]], report_rows:
 def _is_after_9am_edt() -> bool:
     """Return True if current time is after 9:00 AM EDT."""
     try:
-        from zoneinfo import ZoneInfo
         edt = ZoneInfo("America/New_York")
     except Exception:
         edt = dt.timezone(dt.timedelta(hours=-4))
@@ -171,7 +425,6 @@ def _get_campaigns_with_today_clicks(
 ) -> set[str]:
     """Fetch today's report and return campaign IDs that have clicks > 0 today."""
     try:
-        from zoneinfo import ZoneInfo
         edt = ZoneInfo("America/New_York")
     except Exception:
         edt = dt.timezone(dt.timedelta(hours=-4))
@@ -183,20 +436,12 @@ def _get_campaigns_with_today_clicks(
     log("checker.today_clicks.fetched", rows=len(today_rows))
 
     clicked: set[str] = set()
-    for row in today_rows or []:
-        cid = None
-        for k in ["campaign_id", "id", "campaign", "campaignId"]:
-            if row.get(k) is not None:
-                cid = str(row.get(k))
-                break
+    for row in today_rows or ():
+        cid = _row_campaign_id(row)
         if not cid or cid not in campaign_ids:
             continue
 
-        clicks = _pick_number(row, [
-            "clicks", "total_clicks", "totalClicks",
-            "lp_clicks", "lpClicks", "lp_views", "lpViews",
-            "ts_clicks", "click",
-        ]) or 0.0
+        clicks = _pick_number(row, _CLICK_KEYS) or 0.0
 
         if clicks > 0:
             clicked.add(cid)
@@ -204,7 +449,7 @@ def _get_campaigns_with_today_clicks(
     return clicked
 
 
-def run_full_check(
+async def run_full_check_async(
     redtrack: RedTrackClient,
     *,
     date_from: str | None = None,
@@ -212,11 +457,14 @@ def run_full_check(
     days_lookback: int = 7,
     stop_flag: Any = None,
     on_result: Any = None,
+    use_meta_cache: bool = True,
 ) -> list[dict[str, Any]]:
-    """Runs the check.
+    """Async implementation of :func:`run_full_check`.
 
-    Returns a list of result dicts:
-    {campaign, stats, domain, urls, checks:[UrlCheck...]}
+    RedTrack calls stay on the (thread-safe, rate-limited) sync client and run in worker
+    threads. Campaigns are processed concurrently: a bounded number at a time fetch their
+    metadata (RedTrack calls are bounded by one semaphore), and each campaign's URL probes
+    start as soon as its metadata is known, bounded by another.
     """
     if date_from and date_to:
         df = dt.date.fromisoformat(date_from)
@@ -227,10 +475,12 @@ def run_full_check(
 
     log("checker.window", date_from=str(df), date_to=str(dt_), timezone=TIMEZONE)
 
-    campaigns = redtrack.list_active_campaigns()
+    campaigns = await asyncio.to_thread(redtrack.list_active_campaigns)
     log("checker.campaigns.fetched", count=len(campaigns))
+    # id -> campaign, in list order (a campaign listed twice is only checked once)
+    campaigns_by_id = {str(c["id"]): c for c in campaigns if c.get("id") is not None}
 
-    report_rows = redtrack.report_by_campaign(df, dt_)
+    report_rows = await asyncio.to_thread(redtrack.report_by_campaign, df, dt_)
     log("checker.report.fetched", rows=len(report_rows))
 
     active_map = filter_campaigns_with_activity(campaigns, report_rows)
@@ -239,7 +489,7 @@ def run_full_check(
     # After 9 AM EDT: narrow down to campaigns that received clicks TODAY
     after_9am = _is_after_9am_edt()
     if after_9am:
-        today_clicked = _get_campaigns_with_today_clicks(redtrack, set(active_map.keys()))
+        today_clicked = await asyncio.to_thread(_get_campaigns_with_today_clicks, redtrack, set(active_map.keys()))
         log("checker.today_clicks.filter", after_9am=True, total_active=len(active_map), with_clicks_today=len(today_clicked))
         # Only keep campaigns that have clicks today
         active_map = {cid: stats for cid, stats in active_map.items() if cid in today_clicked}
@@ -247,43 +497,98 @@ def run_full_check(
     else:
         log("checker.today_clicks.filter", after_9am=False, note="before 9 AM EDT, checking all active campaigns")
 
-    results: list[dict[str, Any]] = []
-    domain_cache: dict[str, dict[str, Any]] = {}
-    landing_cache: dict[str, dict[str, Any]] = {}
+    # id -> shared lookup, so each domain/landing is fetched once even when campaigns race for it.
+    domain_cache: dict[str, asyncio.Future[dict[str, Any]]] = {}
+    landing_cache: dict[str, asyncio.Future[dict[str, Any]]] = {}
+
+    meta_cache = load_meta_cache()
+    campaign_cache = _fresh_entries(meta_cache.get("campaigns"), _CAMPAIGN_CACHE_TTL_SECONDS)
+    domain_store = _fresh_entries(meta_cache.get("domains"), _LOOKUP_CACHE_TTL_SECONDS)
+    landing_store = _fresh_entries(meta_cache.get("landings"), _LOOKUP_CACHE_TTL_SECONDS)
 
     processed = 0
+    stopped = False
     target = len(active_map)
 
-    for c in campaigns:
-        # Check if stop was requested
-        if stop_flag and callable(stop_flag) and stop_flag():
-            log("checker.stopped", processed=processed, target=target)
-            break
-
-        cid = str(c.get("id"))
-        if cid not in active_map:
-            continue
-
-        processed += 1
-        if processed == 1 or processed % 25 == 0 or processed == target:
-            log("checker.progress", processed=processed, target=target)
-
-        debug("checker.campaign.start", campaign_id=cid, title=c.get("title"), status=c.get("status"))
-
-        # full campaign object (contains streams etc.)
-        full = redtrack.get_campaign(cid)
-        meta = extract_urls_from_campaign(full)
-
-        # domain name lookup
-        domain_name = None
-        if meta.get("domain_id"):
-            did = str(meta["domain_id"])
-            if did not in domain_cache:
-                try:
-                    domain_cache[did] = redtrack.get_domain(did)
-                except Exception:
-                    domain_cache[did] = {}
-            domain_name = _pick_str(domain_cache[did], ["name", "domain", "title", "hostname"]) or domain_cache[did].get("domain")
+    # Bounds concurrent RedTrack calls; the client's own RPM limiter still applies underneath.
+    rt_sem = asyncio.Semaphore(_REDTRACK_CONCURRENCY)
+    # Bounds campaigns in their RedTrack phase (campaign fetch + domain/landing lookups). Without
+    # it every campaign's get_campaign queues on rt_sem ahead of the first campaign's lookups, so
+    # nothing finishes until most of the list has been fetched.
+    admit_sem = asyncio.Semaphore(_REDTRACK_CONCURRENCY)
+
+    async def _lookup_or_empty(fn: Any, id_: str, store: dict[str, dict[str, Any]], keep: tuple[str, ...]) -> dict[str, Any]:
+        hit = store.get(id_) if use_meta_cache else None
+        if hit and isinstance(hit.get("payload"), dict):
+            return hit["payload"]
+        try:
+            async with rt_sem:
+                payload = await asyncio.to_thread(fn, id_)
+        except Exception:
+            return {}
+        if payload:
+            # Persist only the fields we read back, not the whole RedTrack object.
+            store[id_] = {"ts": int(time.time()), "payload": {k: payload[k] for k in keep if k in payload}}
+        return payload
+
+    def _lookup(
+        cache: dict[str, asyncio.Future[dict[str, Any]]],
+        fn: Any,
+        id_: str,
+        store: dict[str, dict[str, Any]],
+        keep: tuple[str, ...],
+    ) -> asyncio.Future[dict[str, Any]]:
+        fut = cache.get(id_)
+        if fut is None:
+            fut = cache[id_] = asyncio.ensure_future(_lookup_or_empty(fn, id_, store, keep))
+        return fut
+
+    async def _process(cid: str, c: dict[str, Any], probe: _ProbeRun) -> dict[str, Any] | None:
+        nonlocal processed, stopped
+
+        async with admit_sem:
+            # Check if stop was requested
+            if stopped:
+                return None
+            if stop_flag and callable(stop_flag) and stop_flag():
+                stopped = True
+                log("checker.stopped", processed=processed, target=target)
+                return None
+
+            processed += 1
+            if processed == 1 or processed % 25 == 0 or processed == target:
+                log("checker.progress", processed=processed, target=target)
+
+            debug("checker.campaign.start", campaign_id=cid, title=c.get("title"), status=c.get("status"))
+
+            # Skip the full campaign fetch when its list entry hasn't changed since we cached it.
+            h = _campaign_hash(c)
+            cached = campaign_cache.get(cid) if use_meta_cache else None
+            if cached and cached.get("hash") == h and isinstance(cached.get("meta"), dict):
+                title, status, meta = cached.get("title"), cached.get("status"), cached["meta"]
+                debug("checker.campaign.cached", campaign_id=cid)
+            else:
+                # full campaign object (contains streams etc.)
+                async with rt_sem:
+                    full = await asyncio.to_thread(redtrack.get_campaign, cid)
+                title, status = full.get("title"), full.get("status")
+                meta = extract_urls_from_campaign(full)
+                campaign_cache[cid] = {"hash": h, "ts": int(time.time()), "title": title, "status": status, "meta": meta}
+
+            # domain + landing lookups for this campaign run concurrently
+            did = str(meta["domain_id"]) if meta.get("domain_id") else None
+            domain_fut = _lookup(domain_cache, redtrack.get_domain, did, domain_store, _DOMAIN_NAME_KEYS) if did else None
+            landing_futs = [
+                _lookup(landing_cache, redtrack.get_landing, lid, landing_store, ("url",))
+                for lid in meta.get("landing_ids") or []
+            ]
+
+            # domain name lookup
+            domain_name = None
+            if domain_fut is not None:
+                domain = await domain_fut
+                domain_name = _pick_str(domain, _DOMAIN_NAME_KEYS) or domain.get("domain")
+            landings = await asyncio.gather(*landing_futs)
 
         urls_to_check: list[tuple[str, str]] = []  # (kind, url)
         if meta.get("tracking_url"):
@@ -295,60 +600,85 @@ def run_full_check(
             urls_to_check.append(("domain_http", f"http://{domain_name}"))
 
         # landing urls
-        landing_urls: list[str] = []
-        for lid in meta.get("landing_ids") or []:
-            if lid not in landing_cache:
-                try:
-                    landing_cache[lid] = redtrack.get_landing(lid)
-                except Exception:
-                    landing_cache[lid] = {}
-            u = _pick_str(landing_cache[lid], ["url"])
+        for landing in landings:
+            u = _pick_str(landing, ("url",))
             if u:
-                landing_urls.append(u)
-
-        for u in landing_urls:
-            urls_to_check.append(("landing", u))
-
-        checks: list[dict[str, Any]] = []
-        for kind, url in urls_to_check:
-            # DNS precheck if url has host
-            try:
-                host = urlparse(url).hostname
-            except Exception:
-                host = None
-            if host:
-                ok_dns, dns_msg = dns_check(host)
-                if not ok_dns:
-                    checks.append({"kind": kind, **UrlCheck(ok=False, failure_type="dns", message=dns_msg, tested_url=url).__dict__})
-                    continue
-
-            best: UrlCheck | None = None
-            for attempt in range(CHECK_RETRIES + 1):
-                res = http_check(url)
-                best = res
-                if res.ok:
-                    break
-            checks.append({"kind": kind, **(best.__dict__ if best else UrlCheck(ok=False, failure_type="other", message="unknown").__dict__)})
+                urls_to_check.append(("landing", u))
 
         entry = {
             "campaign": {
                 "id": cid,
-                "title": full.get("title"),
-                "status": full.get("status"),
+                "title": title,
+                "status": status,
                 "domain_id": meta.get("domain_id"),
                 "domain_name": domain_name,
                 "trackback_url": meta.get("tracking_url"),
             },
             "stats": active_map[cid],
-            "checks": checks,
+            "checks": [],
         }
-        results.append(entry)
-
-        if on_result and callable(on_result):
-            try:
-                on_result(entry, target)
-            except Exception:
-                pass
+        return await _check_campaign(probe, entry, urls_to_check, target=target, on_result=on_result)
+
+    _prune_url_cache()
+    async with _http_transport() as transport:
+        probe = _ProbeRun(transport=transport, sem=asyncio.Semaphore(_CHECK_CONCURRENCY))
+        # Campaigns are processed concurrently; gather keeps results in campaign order.
+        done = await asyncio.gather(*(_process(cid, c, probe) for cid, c in campaigns_by_id.items() if cid in active_map))
+        results = [r for r in done if r is not None]
+
+    meta_cache["campaigns"] = campaign_cache
+    meta_cache["domains"] = domain_store
+    meta_cache["landings"] = landing_store
+    try:
+        save_meta_cache(meta_cache)
+    except Exception as e:
+        log("checker.meta_cache.error", error=str(e))
 
     log("checker.done", checked=len(results), processed=processed, target=target)
     return results
+
+
+def run_full_check(
+    redtrack: RedTrackClient,
+    *,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    days_lookback: int = 7,
+    stop_flag: Any = None,
+    on_result: Any = None,
+    use_meta_cache: bool = True,
+) -> list[dict[str, Any]]:
+    """Runs the check.
+
+    Returns a list of result dicts:
+    {campaign, stats, domain, urls, checks:[UrlCheck...]}
+
+    Sync entry point for the scheduler / bot / web threads; drives
+    :func:`run_full_check_async` on a private event loop. With ``use_meta_cache=False``
+    (manual and bot runs) all RedTrack metadata is fetched fresh; the cache is still refreshed.
+    """
+    return asyncio.run(
+        run_full_check_async(
+            redtrack,
+            date_from=date_from,
+            date_to=date_to,
+            days_lookback=days_lookback,
+            stop_flag=stop_flag,
+            on_result=on_result,
+            use_meta_cache=use_meta_cache,
+        )
+    )
+
+
+def collect_failures(results: list[dict[str, Any]]) -> list[tuple[dict[str, Any], list[dict[str, Any]]]]:
+    """(result, failed checks) for every result with at least one failed check, in order.
+
+    One pass over the results; callers take the failing count from ``len()`` and
+    reuse the pairs for message formatting instead of re-scanning ``checks``.
+    """
+    out: list[tuple[dict[str, Any], list[dict[str, Any]]]] = []
+    for r in results:
+        failed = [ch for ch in r.get("checks", []) if not ch.get("ok")]
+        if failed:
+            out.append((r, failed))
+    return out
@@ -20,9 +20,11 @@ TELEGRAM_CHAT_ID = env("TELEGRAM_CHAT_ID")
 TELEGRAM_VERBOSE = (env("TELEGRAM_VERBOSE", "false") or "false").lower() in ("1", "true", "yes")  # reserved / unused now
 MAX_TELEGRAM_MESSAGES_PER_RUN = int(env("MAX_TELEGRAM_MESSAGES_PER_RUN", "25") or 25)
 
-RESULTS_PATH = env("RESULTS_PATH", "./data/results.json")
+RESULTS_PATH = env("RESULTS_PATH", "./data/results.jsonl")
 MAX_CACHED_RUNS = int(env("MAX_CACHED_RUNS", "30") or 30)
+META_CACHE_PATH = env("META_CACHE_PATH", "./data/meta_cache.json")
 
 CHECK_TIMEOUT_SECONDS = int(env("CHECK_TIMEOUT_SECONDS", "15") or 15)
 CHECK_RETRIES = int(env("CHECK_RETRIES", "2") or 2)
+CHECK_CONCURRENCY = max(1, int(env("CHECK_CONCURRENCY", "50") or 50))
 ALERT_ON_FIRST_FAILURE = (env("ALERT_ON_FIRST_FAILURE", "false") or "false").lower() in ("1", "true", "yes")
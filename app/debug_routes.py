@@ -14,8 +14,8 @@ def debug_redtrack():
 
     This helps debug response shapes without exposing the API key.
     """
-    rt = RedTrackClient()
-    raw = rt._get("/campaigns/v2", params={"page": 1, "per": 1, "timezone": "UTC"}, retries=0)
+    with RedTrackClient() as rt:
+        raw = rt._get("/campaigns/v2", params={"page": 1, "per": 1, "timezone": "UTC"}, retries=0)
     kind = type(raw).__name__
     keys = list(raw.keys()) if isinstance(raw, dict) else None
     sample = None
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import functools
+import os
+import threading
+import time
+from typing import Any, Callable, TypeVar
+
+# Short-lived memo for read-only views of files the dashboard shows on every request.
+# An entry is reused while the file's (mtime, size) is unchanged and it is younger than
+# the TTL, so a write is picked up on the next request after it lands.
+
+T = TypeVar("T")
+
+_DEFAULT_TTL_SECONDS = 2.0
+
+
+def file_key(path: str) -> tuple[int, int] | None:
+    """(mtime_ns, size) of ``path``, or None if it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def mtime_cached(path: str, ttl_s: float = _DEFAULT_TTL_SECONDS) -> Callable[[Callable[[], T]], Callable[[], T]]:
+    """Cache a zero-arg loader on the (mtime, size) of ``path``, for at most ``ttl_s``.
+
+    Callers must treat the returned value as read-only; it is shared between requests.
+    """
+
+    def wrap(loader: Callable[[], T]) -> Callable[[], T]:
+        lock = threading.Lock()
+        entry: dict[str, Any] = {}
+
+        @functools.wraps(loader)
+        def cached() -> T:
+            key = file_key(path)
+            now = time.monotonic()
+            with lock:
+                if entry and entry["key"] == key and now - entry["at"] < ttl_s:
+                    return entry["value"]
+            value = loader()
+            with lock:
+                entry.update(key=key, at=now, value=value)
+            return value
+
+        return cached
+
+    return wrap
@@ -2,11 +2,16 @@ from __future__ import annotations
 
 import json
 import os
+import sys
 import time
 from typing import Any
 
+import orjson
+
 DEBUG = (os.getenv("DEBUG", "false") or "false").lower() in ("1", "true", "yes")
 
+_DUMPS_OPTS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+
 
 def log(event: str, **fields: Any) -> None:
     rec = {
@@ -14,9 +19,30 @@ def log(event: str, **fields: Any) -> None:
         "event": event,
         **fields,
     }
-    print(json.dumps(rec, default=str))
+    try:
+        line = orjson.dumps(rec, default=str, option=_DUMPS_OPTS)
+    except TypeError:
+        # orjson rejects a few things stdlib json tolerates (e.g. >64-bit ints); never fail a log call.
+        line = (json.dumps(rec, default=str) + "\n").encode()
+    out = getattr(sys.stdout, "buffer", None)
+    if out is None:
+        sys.stdout.write(line.decode())
+        sys.stdout.flush()
+    else:
+        # Drain anything print() left in the text wrapper first so lines stay in order,
+        # and flush so records aren't held back when stdout is a pipe.
+        sys.stdout.flush()
+        out.write(line)
+        out.flush()
+
+
+def _debug(event: str, **fields: Any) -> None:
+    log(event, **fields)
+
+
+def _debug_disabled(event: str, **fields: Any) -> None:
+    pass
 
 
-def debug(event: str, **fields: Any) -> None:
-    if DEBUG:
-        log(event, **fields)
+# Resolved once at import so disabled debug calls don't pay for a DEBUG check each time.
+debug = _debug if DEBUG else _debug_disabled
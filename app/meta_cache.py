@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from typing import Any
+
+from .config import META_CACHE_PATH
+
+# On-disk cache of RedTrack metadata that rarely changes between runs.
+# Shape: {"campaigns": {id: {...}}, "domains": {id: {...}}, "landings": {id: {...}}}
+# The file is read once per process; later runs use the in-memory copy.
+
+_lock = threading.Lock()
+_doc: dict[str, Any] | None = None
+
+
+def _read() -> dict[str, Any]:
+    if not os.path.exists(META_CACHE_PATH):
+        return {}
+    try:
+        with open(META_CACHE_PATH, "r", encoding="utf-8") as f:
+            doc = json.load(f)
+    except Exception:
+        # A corrupt/partial cache is just a cache miss.
+        return {}
+    return doc if isinstance(doc, dict) else {}
+
+
+def load_meta_cache() -> dict[str, Any]:
+    global _doc
+    with _lock:
+        if _doc is None:
+            _doc = _read()
+        # Shallow copy: callers replace whole sections, never mutate ours in place.
+        return dict(_doc)
+
+
+def save_meta_cache(doc: dict[str, Any]) -> None:
+    global _doc
+    os.makedirs(os.path.dirname(META_CACHE_PATH) or ".", exist_ok=True)
+    with _lock:
+        tmp = META_CACHE_PATH + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(doc, f)
+        os.replace(tmp, META_CACHE_PATH)
+        _doc = dict(doc)
@@ -1,14 +1,18 @@
 from __future__ import annotations
 
 import datetime as dt
+import math
+import random
 import threading
 import time
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
 
 import httpx
+import orjson
 
 from .config import REDTRACK_API_BASE, REDTRACK_API_KEY, TIMEZONE
-from .log import debug
+from .log import DEBUG, debug
 
 # Rate limiter: max 20 requests per minute (safe limit to avoid 429s)
 _RPM_LIMIT = 20
@@ -37,10 +41,46 @@ def _rate_limit():
         _rpm_timestamps.append(time.time())
 
 
+def _backoff(attempt: int, *, base: float = 0.5, cap: float = 8.0) -> float:
+    """Full-jitter exponential backoff, so parallel callers don't retry in lockstep."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+# Max list pages fetched in parallel once the total is known (the RPM limiter still applies).
+_PAGE_CONCURRENCY = 5
+
+
 class RedTrackError(RuntimeError):
     pass
 
 
+_ACTIVE_STATUSES = frozenset({"active", "enabled", "1", "true"})
+# Common exact spellings, matched before paying for a lowercased copy.
+_ACTIVE_RAW = _ACTIVE_STATUSES | {"Active", "Enabled", "True", "ACTIVE", "ENABLED", "TRUE"}
+
+
+def _is_active(c: dict[str, Any]) -> bool:
+    v = c.get("status")
+    if v is None:
+        return False
+    if isinstance(v, str):
+        return v in _ACTIVE_RAW or v.lower() in _ACTIVE_STATUSES
+    # non-string statuses (1, True, ...) compare by their string form as before
+    return str(v).lower() in _ACTIVE_STATUSES
+
+
+def _dict_items(items: list[Any]) -> list[dict[str, Any]]:
+    """Dict elements only (defensive); the freshly parsed list itself when it's all dicts."""
+    if all(isinstance(x, dict) for x in items):
+        return items
+    return [x for x in items if isinstance(x, dict)]
+
+
+def _snippet(r: httpx.Response, n: int) -> str:
+    """First ``n`` bytes of the body as text, without decoding the whole response."""
+    return r.content[:n].decode("utf-8", "replace")
+
+
 def _require_key():
     if not REDTRACK_API_KEY:
         raise RedTrackError("REDTRACK_API_KEY is not set")
@@ -50,7 +90,29 @@ class RedTrackClient:
     def __init__(self, base_url: str | None = None, api_key: str | None = None, timeout_s: int = 30):
         self.base_url = (base_url or REDTRACK_API_BASE).rstrip("/")
         self.api_key = api_key or REDTRACK_API_KEY
-        self.client = httpx.Client(base_url=self.base_url, timeout=timeout_s)
+        # One keep-alive pool (HTTP/2 where RedTrack offers it) for every call this client makes.
+        # api_key/format=json ride along as client defaults instead of being rebuilt per call.
+        self.client = httpx.Client(
+            base_url=self.base_url,
+            timeout=timeout_s,
+            headers={"Accept": "application/json"},
+            params={"api_key": self.api_key, "format": "json"} if self.api_key else None,
+            # transport-level retries only cover failed connects; HTTP errors are retried in _get
+            transport=httpx.HTTPTransport(
+                http2=True,
+                retries=3,
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=60.0),
+            ),
+        )
+
+    def close(self) -> None:
+        self.client.close()
+
+    def __enter__(self) -> RedTrackClient:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
 
     @staticmethod
     def _normalize_list_payload(data: Any, *, label: str) -> list[dict[str, Any]]:
@@ -61,52 +123,62 @@ class RedTrackClient:
         - an envelope: {items:[...], total:{...}}
         - an envelope: {data:[...]}
         """
-        if isinstance(data, list):
-            # Filter to dict elements only (defensive)
-            return [x for x in data if isinstance(x, dict)]
-        if isinstance(data, dict):
-            if data.get("error"):
-                raise RedTrackError(f"RedTrack error in {label}: {data.get('error')}")
-            for k in ("items", "data", "result"):
-                v = data.get(k)
-                if isinstance(v, list):
-                    return [x for x in v if isinstance(x, dict)]
+        match data:
+            case list():
+                return _dict_items(data)
+            case {"error": err} if err:
+                raise RedTrackError(f"RedTrack error in {label}: {err}")
+            # first list-valued envelope key wins, in this order
+            case {"items": list() as v} | {"data": list() as v} | {"result": list() as v}:
+                return _dict_items(v)
         raise RedTrackError(f"Unexpected {label} response shape: {type(data)}")
 
+    @staticmethod
+    def _total_count(data: Any) -> int | None:
+        """Total item count from a list envelope, if RedTrack included one."""
+        if not isinstance(data, dict):
+            return None
+        for k in ("total", "count", "total_count", "totalCount"):
+            v = data.get(k)
+            if isinstance(v, int) and not isinstance(v, bool):
+                return v
+        return None
+
     def _get(self, path: str, params: dict[str, Any] | None = None, *, retries: int = 3) -> Any:
         if not self.api_key:
             raise RedTrackError("Missing api key (REDTRACK_API_KEY)")
-        # Many RedTrack endpoints accept/require format=json
-        p = {"api_key": self.api_key, "format": "json"}
-        if params:
-            p.update({k: v for k, v in params.items() if v is not None})
+        # api_key + format=json (many endpoints require it) are client-level default params.
+        p = {k: v for k, v in params.items() if v is not None} if params else {}
 
         last_err: str | None = None
         for attempt in range(retries + 1):
             # Respect rate limit before every request
             _rate_limit()
 
-            debug("redtrack.request", path=path, attempt=attempt, params=p)
-            r = self.client.get(path, params=p, headers={"Accept": "application/json"})
-            debug("redtrack.response", path=path, status=r.status_code, text_snippet=r.text[:200])
+            # Guarded so the snippet isn't built for nothing when debug logging is off.
+            if DEBUG:
+                debug("redtrack.request", path=path, attempt=attempt, params=p)
+            r = self.client.get(path, params=p)
+            if DEBUG:
+                debug("redtrack.response", path=path, status=r.status_code, text_snippet=_snippet(r, 200))
 
             # 429 Too Many Requests: wait and retry
             if r.status_code == 429 and attempt < retries:
-                wait = 5 * (attempt + 1)
+                wait = 5 * (attempt + 1) + random.uniform(0, 1)
                 debug("redtrack.rate_limited", path=path, attempt=attempt, wait_s=wait)
                 time.sleep(wait)
                 continue
 
-            # Try to parse JSON for nicer errors
+            # Try to parse JSON for nicer errors (orjson reads the raw body bytes, no str decode)
             data = None
             try:
-                data = r.json()
+                data = orjson.loads(r.content)
             except Exception:
                 data = None
 
             # If response isn't JSON at all, treat as error (we rely on JSON shapes downstream)
             if data is None:
-                last_err = f"{r.status_code} non-json response: {r.text[:200]}"
+                last_err = f"{r.status_code} non-json response: {_snippet(r, 200)}"
                 break
 
             # Some RedTrack errors come back as JSON with 200 or 4xx
@@ -120,14 +192,45 @@ class RedTrackClient:
                 return data
 
             # retry only on 5xx
-            last_err = last_err or f"{r.status_code} {r.text[:500]}"
+            last_err = last_err or f"{r.status_code} {_snippet(r, 500)}"
             if 500 <= r.status_code < 600 and attempt < retries:
-                time.sleep(1.5 * (attempt + 1))
+                time.sleep(_backoff(attempt))
                 continue
             break
 
         raise RedTrackError(f"RedTrack GET {path} failed: {last_err}")
 
+    def _fetch_pages(self, page_fn: Callable[[int], tuple[Any, list[dict[str, Any]]]], per: int) -> list[dict[str, Any]]:
+        """Collect a paginated list; ``page_fn(n)`` returns ``(raw envelope, items)`` for page n."""
+        raw, data = page_fn(1)
+        out: list[dict[str, Any]] = list(data)
+        if len(data) < per:
+            return out
+
+        page = 2
+        total = self._total_count(raw)
+        if total is not None:
+            # Count known up front: fetch the remaining pages in parallel (results keep page order).
+            pages = math.ceil(total / per)
+            with ThreadPoolExecutor(max_workers=_PAGE_CONCURRENCY) as ex:
+                for _, data in ex.map(page_fn, range(2, pages + 1)):
+                    out.extend(data)
+            if len(data) < per:
+                return out
+            # Count was stale (items added meanwhile): keep walking from there.
+            page = max(pages + 1, 2)
+
+        # No (reliable) count in the envelope: walk pages until a short one. The next page is
+        # only requested once the current one came back full, so no rate-limited call is spent
+        # speculatively past the end.
+        while True:
+            _, data = page_fn(page)
+            out.extend(data)
+            if len(data) < per:
+                break
+            page += 1
+        return out
+
     def list_active_campaigns(self, per: int = 200) -> list[dict[str, Any]]:
         """Return active campaigns.
 
@@ -136,9 +239,7 @@ class RedTrackClient:
         """
 
         def _list(path: str) -> list[dict[str, Any]]:
-            out: list[dict[str, Any]] = []
-            page = 1
-            while True:
+            def _page(page: int) -> tuple[Any, list[dict[str, Any]]]:
                 # NOTE: Some RedTrack setups return 500 when using status filter.
                 # So we fetch without status and filter locally.
                 raw = self._get(
@@ -149,19 +250,9 @@ class RedTrackClient:
                         "timezone": TIMEZONE,
                     },
                 )
-                data = self._normalize_list_payload(raw, label=f"campaigns list {path}")
-                out.extend(data)
-                if len(data) < per:
-                    break
-                page += 1
-            return out
+                return raw, self._normalize_list_payload(raw, label=f"campaigns list {path}")
 
-        def _is_active(c: dict[str, Any]) -> bool:
-            v = c.get("status")
-            if v is None:
-                return False
-            s = str(v).lower()
-            return s in ("active", "enabled", "1", "true")
+            return self._fetch_pages(_page, per)
 
         try:
             all_ = _list("/campaigns/v2")
@@ -184,9 +275,7 @@ class RedTrackClient:
 
     def report_by_campaign(self, date_from: dt.date, date_to: dt.date, *, per: int = 1000) -> list[dict[str, Any]]:
         # group=campaign is the common grouping in RedTrack.
-        out: list[dict[str, Any]] = []
-        page = 1
-        while True:
+        def _page(page: int) -> tuple[Any, list[dict[str, Any]]]:
             raw = self._get(
                 "/report",
                 params={
@@ -200,9 +289,6 @@ class RedTrackClient:
                     "include_zero_rows": 0,
                 },
             )
-            items = self._normalize_list_payload(raw, label=f"report page {page}")
-            out.extend(items)
-            if len(items) < per:
-                break
-            page += 1
-        return out
+            return raw, self._normalize_list_payload(raw, label=f"report page {page}")
+
+        return self._fetch_pages(_page, per)
@@ -1,35 +1,127 @@
 from __future__ import annotations
 
-import json
 import os
-import time
+import threading
+from collections import deque
 from typing import Any
 
+import orjson
+
 from .config import MAX_CACHED_RUNS, RESULTS_PATH
 
+# Runs are stored one JSON object per line, oldest first. Appends are O(1);
+# once the log grows past twice the cache size it is trimmed back to the
+# newest MAX_CACHED_RUNS lines.
+_ROTATE_AT_LINES = MAX_CACHED_RUNS * 2
+# The newest run with only its failing results, rewritten atomically on every append,
+# so the dashboard doesn't parse a run's passing campaigns just to list the failing ones.
+LATEST_SUMMARY_PATH = os.path.splitext(RESULTS_PATH)[0] + ".latest.json"
+
+_lock = threading.Lock()
+_line_count: int | None = None
+
+
+def _tail(n: int) -> deque[bytes]:
+    with open(RESULTS_PATH, "rb") as f:
+        return deque((line for line in f if line.strip()), maxlen=n)
+
 
 def load_results() -> dict[str, Any]:
     if not os.path.exists(RESULTS_PATH):
         return {"runs": []}
-    with open(RESULTS_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+    runs: list[dict[str, Any]] = []
+    for line in reversed(_tail(MAX_CACHED_RUNS)):
+        try:
+            run = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            continue
+        if isinstance(run, dict):
+            runs.append(run)
+    return {"runs": runs, "updated_at_epoch": int(os.path.getmtime(RESULTS_PATH))}
 
 
-def save_results(doc: dict[str, Any]) -> None:
-    os.makedirs(os.path.dirname(RESULTS_PATH) or ".", exist_ok=True)
-    tmp = RESULTS_PATH + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(doc, f, indent=2, sort_keys=True)
-    os.replace(tmp, RESULTS_PATH)
+def _last_line() -> bytes:
+    """Last non-empty line, read backwards from the end in blocks."""
+    with open(RESULTS_PATH, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        buf = b""
+        while pos > 0:
+            step = min(65536, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+            tail = buf.rstrip()
+            i = tail.rfind(b"\n")
+            if i != -1:
+                return tail[i + 1 :]
+        return buf.strip()
+
+
+def load_latest_run() -> dict[str, Any] | None:
+    """Newest run only, without reading or parsing the rest of the history."""
+    if not os.path.exists(RESULTS_PATH):
+        return None
+    try:
+        run = orjson.loads(_last_line())
+    except orjson.JSONDecodeError:
+        # torn/foreign last line: fall back to the tolerant tail scan
+        runs = load_results()["runs"]
+        return runs[0] if runs else None
+    return run if isinstance(run, dict) else None
+
+
+def _summary(run: dict[str, Any]) -> dict[str, Any]:
+    results = run.get("results")
+    if not isinstance(results, list):
+        return run
+    failing = [
+        r
+        for r in results
+        if isinstance(r, dict) and any(isinstance(ch, dict) and not ch.get("ok") for ch in r.get("checks") or [])
+    ]
+    return {**run, "results": failing}
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def load_latest_summary() -> dict[str, Any] | None:
+    """Newest run with only its failing results (falls back to the full newest run)."""
+    try:
+        with open(LATEST_SUMMARY_PATH, "rb") as f:
+            run = orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        # no summary yet (runs written before it existed) or a foreign file
+        return load_latest_run()
+    return run if isinstance(run, dict) else load_latest_run()
+
+
+def _rotate() -> int:
+    lines = _tail(MAX_CACHED_RUNS)
+    _write_atomic(RESULTS_PATH, b"".join(lines))
+    return len(lines)
 
 
 def append_run(run: dict[str, Any]) -> None:
-    doc = load_results()
-    runs = doc.get("runs")
-    if not isinstance(runs, list):
-        runs = []
-    runs.insert(0, run)
-    runs = runs[:MAX_CACHED_RUNS]
-    doc["runs"] = runs
-    doc["updated_at_epoch"] = int(time.time())
-    save_results(doc)
+    global _line_count
+    os.makedirs(os.path.dirname(RESULTS_PATH) or ".", exist_ok=True)
+    line = orjson.dumps(run, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    with _lock:
+        if _line_count is None:
+            _line_count = len(_tail(_ROTATE_AT_LINES + 1)) if os.path.exists(RESULTS_PATH) else 0
+        with open(RESULTS_PATH, "a+b") as f:
+            # A torn last line (crash mid-write) or a foreign file without a trailing newline
+            # would otherwise swallow this run into the bad line.
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = b"\n" + line
+            f.write(line)
+        _line_count += 1
+        if _line_count > _ROTATE_AT_LINES:
+            _line_count = _rotate()
+        _write_atomic(LATEST_SUMMARY_PATH, orjson.dumps(_summary(run), option=orjson.OPT_NON_STR_KEYS))
@@ -1,22 +1,36 @@
 from __future__ import annotations
 
+import atexit
+import threading
 import time
 
 from apscheduler.schedulers.background import BackgroundScheduler
 
-from .checker import run_full_check
+from .checker import collect_failures, run_full_check
 from .redtrack import RedTrackClient
-from .storage import load_config, save_config, should_run_now
-from .config import TIMEZONE
-from .telegram import send_message, send_many
+from .storage import load_config, local_now, save_config, should_run_now
+from .config import RESULTS_PATH, TIMEZONE
+from .telegram import failure_lines, send_message, send_many
 from .log import log
 from .config import MAX_TELEGRAM_MESSAGES_PER_RUN, TELEGRAM_VERBOSE
 from .results_store import append_run
-from .url_utils import add_sub5_test
 
 
 _running = False
 
+# One RedTrack client (and its keep-alive pool) reused across scheduled runs; closed at exit.
+_redtrack: RedTrackClient | None = None
+_redtrack_lock = threading.Lock()
+
+
+def _get_redtrack() -> RedTrackClient:
+    global _redtrack
+    with _redtrack_lock:
+        if _redtrack is None:
+            _redtrack = RedTrackClient()
+            atexit.register(_redtrack.close)
+        return _redtrack
+
 
 def _job():
     global _running
@@ -38,33 +52,25 @@ def _job():
         return
 
     # Always update last_run_epoch even on failure, otherwise it will retry every minute forever.
-    import datetime as dt
-
     _running = True
     now_epoch = int(time.time())
     cfg.last_run_epoch = now_epoch
     # record local date for daily schedule guard
-    try:
-        from zoneinfo import ZoneInfo
-
-        today_local = dt.datetime.now(tz=ZoneInfo(TIMEZONE)).date().isoformat()
-    except Exception:
-        today_local = dt.datetime.now().date().isoformat()
-    cfg.last_run_local_date = today_local
+    cfg.last_run_local_date = local_now(TIMEZONE).date().isoformat()
     save_config(cfg)
 
     try:
         log("job.start", date_from=cfg.date_from, date_to=cfg.date_to, days_lookback=cfg.days_lookback)
-        redtrack = RedTrackClient()
         results = run_full_check(
-            redtrack,
+            _get_redtrack(),
             date_from=cfg.date_from,
             date_to=cfg.date_to,
             days_lookback=cfg.days_lookback,
         )
 
         total = len(results)
-        failing = sum(1 for r in results if any(not ch.get("ok") for ch in r.get("checks", [])))
+        failures = collect_failures(results)
+        failing = len(failures)
         log("job.results", total=total, failing=failing)
 
         run_record = {
@@ -77,7 +83,7 @@ def _job():
             "failing": failing,
             "results": results,
         }
-        log("cache.write", path="results.json", runs_cached="append")
+        log("cache.write", path=RESULTS_PATH, runs_cached="append")
         append_run(run_record)
 
         # Telegram notifications: ALWAYS send a summary.
@@ -88,23 +94,7 @@ def _job():
 
             # If failures exist, send details.
             if failing:
-                lines: list[str] = [f"🚨 {failing} failing campaign(s) (checked {total})"]
-                for r in results:
-                    c = r.get("campaign", {})
-                    failed = [ch for ch in r.get("checks", []) if not ch.get("ok")]
-                    if not failed:
-                        continue
-                    lines.append(f"FAIL | {c.get('title') or 'Campaign'} | {c.get('id')} | {c.get('domain_name') or ''}")
-                    # Modify trackback_url to include sub5=test for cloaking bypass
-                    trackback_url = add_sub5_test(c.get("trackback_url"))
-                    if trackback_url:
-                        lines.append(f"  url: {trackback_url}")
-                    for ch in failed[:8]:
-                        # Modify tested_url to include sub5=test
-                        tested_url = add_sub5_test(ch.get('tested_url'))
-                        lines.append(f"  - {ch.get('kind')}: {ch.get('failure_type')} {ch.get('message')} {tested_url or ''}")
-                    lines.append("")
-
+                lines = failure_lines(failures, f"🚨 {failing} failing campaign(s) (checked {total})")
                 send_many(lines, max_messages=MAX_TELEGRAM_MESSAGES_PER_RUN)
 
         except Exception as e:
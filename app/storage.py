@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import datetime as dt
+import functools
 import json
 import os
 import time
 from dataclasses import asdict, dataclass
 from typing import Any
+from zoneinfo import ZoneInfo
+
+import orjson
 
 DEFAULT_PATH = os.getenv("CONFIG_PATH", "./data/config.json")
 
@@ -45,24 +50,50 @@ def load_config(path: str = DEFAULT_PATH) -> AppConfig:
     return AppConfig(**data)
 
 
+# Last bytes written per path, so saving an unchanged config is a no-op instead of a rewrite+rename.
+_last_written: dict[str, bytes] = {}
+
+
 def save_config(cfg: AppConfig, path: str = DEFAULT_PATH) -> None:
+    data = orjson.dumps(asdict(cfg), option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+    if _last_written.get(path) == data and os.path.exists(path):
+        return
     os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
     tmp = path + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(asdict(cfg), f, indent=2, sort_keys=True)
+    with open(tmp, "wb") as f:
+        f.write(data)
     os.replace(tmp, path)
+    _last_written[path] = data
 
 
-def _in_edt_window() -> bool:
-    """Return True if current time in America/New_York is within the operating window."""
-    import datetime as dt
+# The scheduler asks every minute; zone lookups and HH:MM parsing are memoized.
+@functools.lru_cache(maxsize=8)
+def _tz(name: str) -> dt.tzinfo | None:
+    try:
+        return ZoneInfo(name)
+    except Exception:
+        return None
 
+
+def local_now(tz_name: str) -> dt.datetime:
+    """Current time in ``tz_name`` (naive local time if the zone is unknown)."""
+    tz = _tz(tz_name)
+    return dt.datetime.now(tz=tz) if tz else dt.datetime.now()
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_hhmm(hhmm: str) -> tuple[int, int]:
     try:
-        from zoneinfo import ZoneInfo
-        edt = ZoneInfo("America/New_York")
+        hh, mm = [int(x) for x in hhmm.split(":", 1)]
     except Exception:
-        # Fallback: UTC-4 as fixed offset for EDT
-        edt = dt.timezone(dt.timedelta(hours=-4))
+        hh, mm = 17, 0
+    return hh, mm
+
+
+def _in_edt_window() -> bool:
+    """Return True if current time in America/New_York is within the operating window."""
+    # Fallback: UTC-4 as fixed offset for EDT
+    edt = _tz("America/New_York") or dt.timezone(dt.timedelta(hours=-4))
 
     now = dt.datetime.now(tz=edt)
     start = now.replace(hour=EDT_RUN_WINDOW_START[0], minute=EDT_RUN_WINDOW_START[1], second=0, microsecond=0)
@@ -90,16 +121,7 @@ def should_run_now(cfg: AppConfig, *, tz_name: str) -> bool:
         return (now_epoch - int(cfg.last_run_epoch)) >= int(cfg.interval_minutes) * 60
 
     # daily_at
-    try:
-        from zoneinfo import ZoneInfo
-
-        tz = ZoneInfo(tz_name)
-    except Exception:
-        tz = None
-
-    import datetime as dt
-
-    now = dt.datetime.now(tz=tz) if tz else dt.datetime.now()
+    now = local_now(tz_name)
     today = now.date().isoformat()
 
     # already ran today?
@@ -107,11 +129,7 @@ def should_run_now(cfg: AppConfig, *, tz_name: str) -> bool:
         return False
 
     # parse HH:MM
-    hhmm = (cfg.run_at_hhmm or "17:00").strip()
-    try:
-        hh, mm = [int(x) for x in hhmm.split(":", 1)]
-    except Exception:
-        hh, mm = 17, 0
+    hh, mm = _parse_hhmm((cfg.run_at_hhmm or "17:00").strip())
 
     target = now.replace(hour=hh, minute=mm, second=0, microsecond=0)
     return now >= target
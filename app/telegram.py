@@ -1,20 +1,49 @@
 from __future__ import annotations
 
+import atexit
+import threading
+from collections import Counter
+from typing import Any
+
 import httpx
+import orjson
 
 from .config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
 from .log import log
+from .url_utils import add_sub5_test
 
 
 class TelegramError(RuntimeError):
     pass
 
 
+# Request bodies are encoded with orjson and posted as raw content.
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# One keep-alive client for every message, instead of a fresh TCP+TLS handshake per httpx.post.
+_client: httpx.Client | None = None
+_client_lock = threading.Lock()
+
+
+def _get_client() -> httpx.Client:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(
+                    base_url=f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}",
+                    timeout=20,
+                    http2=True,
+                    limits=httpx.Limits(max_connections=8, max_keepalive_connections=4, keepalive_expiry=120),
+                )
+                atexit.register(_client.close)
+    return _client
+
+
 def send_message(text: str, parse_mode: str | None = None, disable_web_page_preview: bool = True) -> None:
     if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
         raise TelegramError("TELEGRAM_BOT_TOKEN or TELEGRAM_CHAT_ID not set")
 
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
     payload = {
         "chat_id": TELEGRAM_CHAT_ID,
         "text": text,
@@ -24,13 +53,43 @@ def send_message(text: str, parse_mode: str | None = None, disable_web_page_prev
         payload["parse_mode"] = parse_mode
 
     log("telegram.send.start", chars=len(text))
-    r = httpx.post(url, json=payload, timeout=20)
+    r = _get_client().post("/sendMessage", content=orjson.dumps(payload), headers=_JSON_HEADERS)
     if r.status_code >= 400:
         log("telegram.send.error", status=r.status_code, body=r.text[:400])
         raise TelegramError(f"Telegram send failed: {r.status_code} {r.text[:400]}")
     log("telegram.send.ok", status=r.status_code)
 
 
+# Telegram caps messages at 4096 chars; leave headroom for the emoji/UTF-16 difference.
+_MAX_CHUNK_CHARS = 3800
+
+
+def _chunks(lines: list[str], limit: int = _MAX_CHUNK_CHARS):
+    """Yield message bodies of at most ``limit`` chars, packing whole lines.
+
+    Lines are buffered in a list with a running size (no repeated string
+    concatenation); a single line longer than ``limit`` is split across
+    messages rather than cut off.
+    """
+    buf: list[str] = []
+    size = 0
+    for line in lines:
+        while len(line) > limit:
+            if buf:
+                yield "\n".join(buf)
+                buf, size = [], 0
+            yield line[:limit]
+            line = line[limit:]
+        add = len(line) + 1
+        if buf and size + add > limit:
+            yield "\n".join(buf)
+            buf, size = [], 0
+        buf.append(line)
+        size += add
+    if buf:
+        yield "\n".join(buf)
+
+
 def send_many(lines: list[str], *, max_messages: int = 25, header: str | None = None) -> None:
     """Send lots of lines, chunked into multiple Telegram messages."""
     if header:
@@ -39,17 +98,45 @@ def send_many(lines: list[str], *, max_messages: int = 25, header: str | None =
     if max_messages <= 0:
         return
 
-    chunk = ""
     sent = 0
-    for line in lines:
-        add = (line + "\n")
-        if len(chunk) + len(add) > 3800:
-            send_message(chunk.rstrip())
-            sent += 1
-            if sent >= max_messages:
-                return
-            chunk = ""
-        chunk += add
-
-    if chunk.strip() and sent < max_messages:
-        send_message(chunk.rstrip())
+    for chunk in _chunks(lines):
+        chunk = chunk.rstrip()
+        if not chunk.strip():
+            continue
+        send_message(chunk)
+        sent += 1
+        if sent >= max_messages:
+            return
+
+
+def failure_lines(failures: list[tuple[dict[str, Any], list[dict[str, Any]]]], header: str) -> list[str]:
+    """Detail lines for ``send_many`` from :func:`app.checker.collect_failures` pairs.
+
+    Identical failed checks within a campaign collapse into one line with a ``× N`` count,
+    and campaigns failing in exactly the same way (typically a shared broken domain) are
+    listed together above a single copy of the check lines.
+    URLs get sub5=test added for cloaking bypass during manual testing.
+    """
+    # signature of the (capped) check lines -> campaigns sharing it, in first-seen order
+    groups: dict[tuple[tuple[Any, ...], ...], list[dict[str, Any]]] = {}
+    for r, failed in failures:
+        counts = Counter(
+            (ch.get("kind"), ch.get("failure_type"), ch.get("message"), ch.get("tested_url")) for ch in failed
+        )
+        sig = tuple((*k, n) for k, n in list(counts.items())[:8])
+        groups.setdefault(sig, []).append(r.get("campaign", {}))
+
+    lines: list[str] = [header]
+    for sig, campaigns in groups.items():
+        for c in campaigns:
+            lines.append(f"FAIL | {c.get('title') or 'Campaign'} | {c.get('id')} | {c.get('domain_name') or ''}")
+            trackback_url = add_sub5_test(c.get("trackback_url"))
+            if trackback_url:
+                lines.append(f"  url: {trackback_url}")
+        if len(campaigns) > 1:
+            lines.append(f"  ({len(campaigns)} campaigns, same failures:)")
+        for kind, failure_type, message, tested_url, n in sig:
+            line = f"  - {kind}: {failure_type} {message} {add_sub5_test(tested_url) or ''}"
+            lines.append(f"{line} × {n}" if n > 1 else line)
+        lines.append("")
+    return lines
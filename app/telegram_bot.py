@@ -1,35 +1,86 @@
 from __future__ import annotations
 
+import atexit
+import hashlib
+import hmac
 import os
 import threading
 import time
 from typing import Any
 
 import httpx
+import orjson
 
-from .checker import run_full_check
+from .checker import collect_failures, run_full_check
 from .config import MAX_TELEGRAM_MESSAGES_PER_RUN, TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
 from .log import log
 from .redtrack import RedTrackClient
 from .results_store import append_run
 from .storage import load_config
-from .telegram import TelegramError, send_many, send_message
-from .url_utils import add_sub5_test
-
-# Check if we should use webhook mode (for production on Render)
-USE_WEBHOOK = os.getenv("TELEGRAM_USE_WEBHOOK", "false").lower() in ("1", "true", "yes")
+from .telegram import TelegramError, failure_lines, send_many, send_message
+from .workers import DaemonWorker
+
+# Public base URL for the webhook; Render sets RENDER_EXTERNAL_URL for web services.
+WEBHOOK_BASE_URL = (os.getenv("TELEGRAM_WEBHOOK_URL") or os.getenv("RENDER_EXTERNAL_URL") or "").rstrip("/")
+# Check if we should use webhook mode (for production on Render): defaults to on when a public URL is known
+_use_webhook = os.getenv("TELEGRAM_USE_WEBHOOK")
+USE_WEBHOOK = _use_webhook.lower() in ("1", "true", "yes") if _use_webhook else bool(WEBHOOK_BASE_URL)
+# Sent back by Telegram as X-Telegram-Bot-Api-Secret-Token on every webhook call we registered.
+WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET") or (
+    hashlib.sha256(f"webhook:{TELEGRAM_BOT_TOKEN}".encode()).hexdigest() if TELEGRAM_BOT_TOKEN else ""
+)
 # Force redeploy to pick up environment variable changes
 
+# getUpdates long-poll window: Telegram holds the request open until an update arrives or this expires.
+_LONG_POLL_SECONDS = 50
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Keep-alive client for the bot's own API calls (getUpdates / deleteWebhook); sends go through telegram.py.
+_client: httpx.Client | None = None
+_client_lock = threading.Lock()
+_webhook_registered = False
+
+# Bot-triggered checks run here: one at a time (the bot's _check_running guard), no thread per
+# command, and a daemon worker so exit never waits on a check (shutdown flushes its partial results).
+_check_worker = DaemonWorker("bot-check")
+
+
+def _get_client() -> httpx.Client:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(
+                    base_url=f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}",
+                    timeout=httpx.Timeout(30, read=_LONG_POLL_SECONDS + 10),
+                    limits=httpx.Limits(max_connections=4, max_keepalive_connections=2),
+                )
+                atexit.register(_client.close)
+    return _client
+
 
 class TelegramBot:
     """Telegram bot that listens for commands and triggers domain checks."""
 
     def __init__(self):
         self.offset = 0
-        self.running = False
-        self._check_running = False
+        # set by stop(); the poll loop checks it and waits on it between retries, so stop() returns promptly
+        self._stop = threading.Event()
+        # set while a check runs; flipped under _check_lock so two /check commands can't both start one
+        self._check_running = threading.Event()
+        self._check_lock = threading.Lock()
         self._stop_requested = False
         self._thread: threading.Thread | None = None
+        self._allowed_chat = str(TELEGRAM_CHAT_ID)
+        # command -> (log name, handler)
+        self._commands = {
+            "/check": ("check", self._handle_check_command),
+            "/run": ("check", self._handle_check_command),
+            "/stop": ("stop", self._handle_stop_command),
+            "/status": ("status", self._handle_status_command),
+            "/help": ("help", self._handle_help_command),
+        }
         # Partial results tracking for graceful shutdown
         self._partial_results: list[dict[str, Any]] = []
         self._partial_target: int = 0
@@ -42,30 +93,58 @@ class TelegramBot:
             return
 
         if USE_WEBHOOK:
-            log("telegram.bot.skip", reason="webhook_mode_enabled")
-            return
+            if not WEBHOOK_BASE_URL:
+                # webhook registered externally; updates arrive on /telegram/webhook
+                log("telegram.bot.skip", reason="webhook_mode_enabled")
+                return
+            if self._set_webhook():
+                log("telegram.bot.start", mode="webhook", url=f"{WEBHOOK_BASE_URL}/telegram/webhook")
+                return
+            log("telegram.bot.webhook_fallback", mode="polling")
 
         # Delete any existing webhook before starting polling
         self._delete_webhook()
 
-        self.running = True
+        self._stop.clear()
         self._thread = threading.Thread(target=self._poll_loop, daemon=True)
         self._thread.start()
         log("telegram.bot.start", mode="polling")
 
     def stop(self):
-        """Stop the bot polling."""
-        self.running = False
+        """Stop the bot polling (and ask a running check to wind down)."""
+        self._stop.set()
+        if self._check_running.is_set():
+            self._stop_requested = True
         if self._thread:
-            self._thread.join(timeout=5)
+            # an in-flight long poll can't be interrupted; the thread is a daemon, so don't wait it out
+            self._thread.join(timeout=2)
         log("telegram.bot.stop")
 
+    def _set_webhook(self) -> bool:
+        """Point Telegram at our /telegram/webhook endpoint. Returns False if registration failed."""
+        global _webhook_registered
+        try:
+            params = {
+                "url": f"{WEBHOOK_BASE_URL}/telegram/webhook",
+                "allowed_updates": ["message"],
+                "max_connections": 40,
+                "secret_token": WEBHOOK_SECRET,
+            }
+            r = _get_client().post("/setWebhook", content=orjson.dumps(params), headers=_JSON_HEADERS, timeout=10)
+            if r.status_code == 200 and orjson.loads(r.content).get("ok"):
+                _webhook_registered = True
+                log("telegram.bot.webhook_set")
+                return True
+            log("telegram.bot.webhook_set_error", status=r.status_code, body=r.text[:200])
+        except Exception as e:
+            log("telegram.bot.webhook_set_exception", error=str(e))
+        return False
+
     def _delete_webhook(self):
         """Delete any existing webhook to avoid 409 conflicts."""
         try:
-            url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/deleteWebhook"
             params = {"drop_pending_updates": True}
-            r = httpx.post(url, json=params, timeout=10)
+            r = _get_client().post("/deleteWebhook", content=orjson.dumps(params), headers=_JSON_HEADERS, timeout=10)
             if r.status_code == 200:
                 log("telegram.bot.webhook_deleted")
             else:
@@ -75,39 +154,42 @@ class TelegramBot:
 
     def _poll_loop(self):
         """Main polling loop that fetches updates from Telegram."""
-        while self.running:
+        while not self._stop.is_set():
             try:
                 updates = self._get_updates()
+                if updates is None:
+                    # failed call: back off briefly instead of spinning (long poll blocks otherwise)
+                    self._stop.wait(1)
+                    continue
                 for update in updates:
                     self._handle_update(update)
             except Exception as e:
                 log("telegram.bot.poll_error", error=str(e))
                 print(f"[telegram_bot] poll error: {e}")
+                self._stop.wait(1)
 
-            # Poll every 2 seconds
-            time.sleep(2)
-
-    def _get_updates(self) -> list[dict[str, Any]]:
-        """Fetch updates from Telegram using long polling."""
-        url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/getUpdates"
+    def _get_updates(self) -> list[dict[str, Any]] | None:
+        """Fetch updates from Telegram using long polling. Returns None if the call failed."""
         params = {
             "offset": self.offset,
-            "timeout": 10,  # Long polling timeout
+            "timeout": _LONG_POLL_SECONDS,
+            # JSON-serialized list, per the Bot API; edits/inline/etc. never wake us
+            "allowed_updates": '["message"]',
         }
 
         try:
-            r = httpx.get(url, params=params, timeout=15)
+            r = _get_client().get("/getUpdates", params=params)
             if r.status_code == 409:
                 log("telegram.bot.conflict", message="Another instance is running. Deleting webhook...")
                 self._delete_webhook()
-                return []
+                return None
             if r.status_code != 200:
                 log("telegram.bot.get_updates_error", status=r.status_code)
-                return []
+                return None
 
-            data = r.json()
+            data = orjson.loads(r.content)
             if not data.get("ok"):
-                return []
+                return None
 
             updates = data.get("result", [])
             if updates:
@@ -117,7 +199,7 @@ class TelegramBot:
             return updates
         except Exception as e:
             log("telegram.bot.get_updates_exception", error=str(e))
-            return []
+            return None
 
     def _handle_update(self, update: dict[str, Any]):
         """Handle a single update from Telegram."""
@@ -131,7 +213,7 @@ class TelegramBot:
         username = from_user.get("username", "unknown")
 
         # Only process commands from the configured chat
-        if str(chat_id) != str(TELEGRAM_CHAT_ID):
+        if str(chat_id) != self._allowed_chat:
             log(
                 "telegram.bot.wrong_chat",
                 chat_id=chat_id,
@@ -140,37 +222,35 @@ class TelegramBot:
             )
             return
 
-        # Handle commands
-        if text.startswith("/check") or text.startswith("/run"):
-            log("telegram.bot.command.check", user=username, chat_id=chat_id)
-            self._handle_check_command()
-        elif text.startswith("/stop"):
-            log("telegram.bot.command.stop", user=username, chat_id=chat_id)
-            self._handle_stop_command()
-        elif text.startswith("/status"):
-            log("telegram.bot.command.status", user=username, chat_id=chat_id)
-            self._handle_status_command()
-        elif text.startswith("/help"):
-            log("telegram.bot.command.help", user=username, chat_id=chat_id)
-            self._handle_help_command()
+        # Handle commands: first word, minus any @botname suffix used in groups
+        parts = text.split(maxsplit=1)
+        cmd = parts[0].split("@", 1)[0] if parts else ""
+        entry = self._commands.get(cmd)
+        if entry:
+            name, handler = entry
+            log(f"telegram.bot.command.{name}", user=username, chat_id=chat_id)
+            handler()
 
     def _handle_check_command(self):
         """Handle the /check or /run command to trigger a domain check."""
-        if self._check_running:
+        with self._check_lock:
+            already_running = self._check_running.is_set()
+            if not already_running:
+                self._check_running.set()
+                # Reset stop flag and run check in background thread
+                self._stop_requested = False
+        if already_running:
             try:
                 send_message("⏳ A domain check is already running. Use /stop to cancel it.")
             except Exception as e:
                 log("telegram.bot.send_error", error=str(e))
             return
 
-        # Reset stop flag and run check in background thread
-        self._stop_requested = False
-        t = threading.Thread(target=self._run_check_in_background, daemon=True)
-        t.start()
+        _check_worker.submit(self._run_check_in_background)
 
     def _handle_stop_command(self):
         """Handle the /stop command to cancel a running check."""
-        if not self._check_running:
+        if not self._check_running.is_set():
             try:
                 send_message("No check is currently running.")
             except Exception as e:
@@ -185,7 +265,6 @@ class TelegramBot:
 
     def _run_check_in_background(self):
         """Run the domain check in a background thread."""
-        self._check_running = True
         self._partial_results = []
         self._partial_target = 0
         self._partial_sent = False
@@ -194,27 +273,33 @@ class TelegramBot:
             log("telegram.bot.check.start")
 
             cfg = load_config()
-            redtrack = RedTrackClient()
-            results = run_full_check(
-                redtrack,
-                date_from=cfg.date_from,
-                date_to=cfg.date_to,
-                days_lookback=cfg.days_lookback,
-                stop_flag=lambda: self._stop_requested,
-                on_result=self._on_partial_result,
-            )
-
-            # Mark as sent so shutdown handler doesn't duplicate
-            self._partial_sent = True
+            with RedTrackClient() as redtrack:
+                results = run_full_check(
+                    redtrack,
+                    date_from=cfg.date_from,
+                    date_to=cfg.date_to,
+                    days_lookback=cfg.days_lookback,
+                    stop_flag=lambda: self._stop_requested,
+                    on_result=self._on_partial_result,
+                    use_meta_cache=False,
+                )
 
+            # Mark as sent so shutdown handler doesn't duplicate; if it already flushed, the
+            # partial results went out (and were stored) once, so don't report them again
+            with self._check_lock:
+                flushed = self._partial_sent
+                self._partial_sent = True
+            if flushed:
+                log("telegram.bot.check.skip_report", reason="partial_already_flushed", total=len(results))
+                return
+
+            total = len(results)
+            failures = collect_failures(results)
+            failing = len(failures)
             if self._stop_requested:
-                total = len(results)
-                failing = sum(1 for r in results if any(not ch.get("ok") for ch in r.get("checks", [])))
                 log("telegram.bot.check.stopped", total=total, failing=failing)
                 send_message(f"🛑 Check stopped. Checked {total} campaigns before stopping. Failures: {failing}.")
             else:
-                total = len(results)
-                failing = sum(1 for r in results if any(not ch.get("ok") for ch in r.get("checks", [])))
                 log("telegram.bot.check.results", total=total, failing=failing)
                 send_message(f"✅ Check complete! Checked {total} campaigns. Failures: {failing}.")
 
@@ -232,7 +317,7 @@ class TelegramBot:
                 }
             )
 
-            self._send_failure_details(results, total)
+            self._send_failure_details(failures, total)
 
         except Exception as e:
             log("telegram.bot.check.error", error=str(e))
@@ -241,7 +326,7 @@ class TelegramBot:
             except Exception:
                 pass
         finally:
-            self._check_running = False
+            self._check_running.clear()
             self._stop_requested = False
 
     def _on_partial_result(self, result: dict[str, Any], target: int):
@@ -251,14 +336,15 @@ class TelegramBot:
 
     def flush_partial_results(self):
         """Send partial results to Telegram on shutdown. Called when Render kills the process."""
-        if self._partial_sent or not self._check_running or not self._partial_results:
-            return
-
-        self._partial_sent = True
+        with self._check_lock:
+            if self._partial_sent or not self._check_running.is_set() or not self._partial_results:
+                return
+            self._partial_sent = True
         results = self._partial_results
         total = len(results)
         target = self._partial_target
-        failing = sum(1 for r in results if any(not ch.get("ok") for ch in r.get("checks", [])))
+        failures = collect_failures(results)
+        failing = len(failures)
 
         log("telegram.bot.check.partial_flush", total=total, target=target, failing=failing)
 
@@ -279,36 +365,17 @@ class TelegramBot:
                 }
             )
 
-            self._send_failure_details(results, total)
+            self._send_failure_details(failures, total)
 
         except Exception as e:
             log("telegram.bot.partial_flush.error", error=str(e))
 
-    def _send_failure_details(self, results: list[dict[str, Any]], total: int):
-        """Send failure detail lines to Telegram."""
-        failing = sum(1 for r in results if any(not ch.get("ok") for ch in r.get("checks", [])))
-        if not failing:
+    def _send_failure_details(self, failures: list[tuple[dict[str, Any], list[dict[str, Any]]]], total: int):
+        """Send failure detail lines to Telegram (``failures`` as from :func:`collect_failures`)."""
+        if not failures:
             return
 
-        lines: list[str] = [f"🚨 {failing} failing campaign(s) (checked {total})"]
-        for r in results:
-            c = r.get("campaign", {})
-            failed = [ch for ch in r.get("checks", []) if not ch.get("ok")]
-            if not failed:
-                continue
-            lines.append(
-                f"FAIL | {c.get('title') or 'Campaign'} | {c.get('id')} | {c.get('domain_name') or ''}"
-            )
-            trackback_url = add_sub5_test(c.get("trackback_url"))
-            if trackback_url:
-                lines.append(f"  url: {trackback_url}")
-            for ch in failed[:8]:
-                tested_url = add_sub5_test(ch.get('tested_url'))
-                lines.append(
-                    f"  - {ch.get('kind')}: {ch.get('failure_type')} {ch.get('message')} {tested_url or ''}"
-                )
-            lines.append("")
-
+        lines = failure_lines(failures, f"🚨 {len(failures)} failing campaign(s) (checked {total})")
         send_many(lines, max_messages=MAX_TELEGRAM_MESSAGES_PER_RUN)
 
     def _handle_status_command(self):
@@ -347,18 +414,21 @@ The bot also runs scheduled checks automatically based on your configuration."""
 # Global bot instance
 _bot: TelegramBot | None = None
 _webhook_handler: TelegramBot | None = None
+# Guards creation of the two globals above (startup vs. early webhook POSTs on separate threads).
+_init_lock = threading.Lock()
 
 
 def start_telegram_bot():
     """Start the Telegram bot (call this on app startup)."""
     global _bot, _webhook_handler
-    if _bot is None:
-        _bot = TelegramBot()
-        _bot.start()
-
-    # Create a separate instance for webhook handling
-    if _webhook_handler is None:
-        _webhook_handler = TelegramBot()
+    with _init_lock:
+        if _bot is None:
+            # Reuse an instance an early webhook call already created, so it keeps any check it started
+            _bot = _webhook_handler or TelegramBot()
+            # Webhook updates go to the same instance, so /stop and the shutdown flush see its running
+            # check; set before start() since setWebhook can deliver updates while start() is running
+            _webhook_handler = _bot
+            _bot.start()
 
     return _bot
 
@@ -366,15 +436,27 @@ def start_telegram_bot():
 def stop_telegram_bot():
     """Stop the Telegram bot (call this on app shutdown)."""
     global _bot
-    if _bot:
-        _bot.stop()
-        _bot = None
+    with _init_lock:
+        bot, _bot = _bot, None
+    if bot:
+        bot.stop()
+
+
+def webhook_secret_ok(token: str | None) -> bool:
+    """Check the secret header on a webhook call (only enforced for a webhook we registered)."""
+    if not _webhook_registered:
+        return True
+    return hmac.compare_digest(token or "", WEBHOOK_SECRET)
 
 
 def handle_telegram_update(update: dict[str, Any]):
     """Handle a Telegram update received via webhook."""
     global _webhook_handler
-    if _webhook_handler is None:
-        _webhook_handler = TelegramBot()
-
-    _webhook_handler._handle_update(update)
+    handler = _webhook_handler
+    if handler is None:
+        with _init_lock:
+            if _webhook_handler is None:
+                _webhook_handler = TelegramBot()
+            handler = _webhook_handler
+
+    handler._handle_update(update)
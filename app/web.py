@@ -1,22 +1,26 @@
 from __future__ import annotations
 
+import asyncio
 import datetime as dt
+import hashlib
 import threading
 
 from fastapi import FastAPI, Form, Request
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response
 from fastapi.templating import Jinja2Templates
 
-from .checker import run_full_check
+from .checker import collect_failures, run_full_check
 from .redtrack import RedTrackClient
 from .scheduler import start_scheduler
-from .storage import AppConfig, load_config, save_config
-from .telegram import send_message
-from .telegram_bot import start_telegram_bot, stop_telegram_bot
+from .storage import DEFAULT_PATH as CONFIG_PATH, AppConfig, load_config, save_config
+from .log import log
+from .telegram import failure_lines, send_many, send_message
+from .telegram_bot import handle_telegram_update, start_telegram_bot, stop_telegram_bot, webhook_secret_ok
 from .debug_routes import router as debug_router
-from .results_store import load_results, append_run
+from .results_store import LATEST_SUMMARY_PATH, append_run, load_latest_summary
 from .config import MAX_TELEGRAM_MESSAGES_PER_RUN, TELEGRAM_VERBOSE
-from .url_utils import add_sub5_test
+from .file_cache import file_key, mtime_cached
+from .workers import DaemonWorker
 
 app = FastAPI(title="Domain Campaign Check")
 app.include_router(debug_router)
@@ -27,6 +31,13 @@ _bot = None
 _lock = threading.Lock()
 _last_run: dict[str, str] = {}
 _is_running = False
+# Set on shutdown so an in-flight manual run winds down and is recorded as partial.
+_stopping = threading.Event()
+# Manual runs execute here; _is_running keeps it to one at a time.
+_manual_worker = DaemonWorker("manual-run")
+# How long shutdown waits for a stopping manual run to record and report what it checked
+# (Render allows 30s between SIGTERM and SIGKILL).
+_SHUTDOWN_WAIT_SECONDS = 20
 
 
 @app.on_event("startup")
@@ -38,37 +49,43 @@ def _startup():
 
 @app.on_event("shutdown")
 def _shutdown():
+    _stopping.set()
     if _bot:
         _bot.flush_partial_results()
         stop_telegram_bot()
+    # The worker is a daemon and would be killed as soon as this hook returns.
+    if not _manual_worker.wait_idle(_SHUTDOWN_WAIT_SECONDS):
+        log("manual.shutdown.timeout", waited_s=_SHUTDOWN_WAIT_SECONDS)
 
 
 def _run_once(cfg: AppConfig):
     global _last_run, _is_running
     try:
-        from .log import log
-
-        _is_running = True
         log("manual.start", date_from=cfg.date_from, date_to=cfg.date_to, days_lookback=cfg.days_lookback)
-        redtrack = RedTrackClient()
-        results = run_full_check(
-            redtrack,
-            date_from=cfg.date_from,
-            date_to=cfg.date_to,
-            days_lookback=cfg.days_lookback,
-        )
+        with RedTrackClient() as redtrack:
+            results = run_full_check(
+                redtrack,
+                date_from=cfg.date_from,
+                date_to=cfg.date_to,
+                days_lookback=cfg.days_lookback,
+                stop_flag=_stopping.is_set,
+                use_meta_cache=False,
+            )
         total = len(results)
-        failing = sum(1 for r in results if any(not ch.get("ok") for ch in r.get("checks", [])))
+        failures = collect_failures(results)
+        failing = len(failures)
+        # stopped by shutdown: results cover only the campaigns checked so far
+        partial = _stopping.is_set()
         _last_run = {
             "time": dt.datetime.now(dt.timezone.utc).isoformat(),
-            "summary": f"Checked {total} campaigns. Failing: {failing}.",
+            "summary": f"{'Stopped early (shutdown). ' if partial else ''}Checked {total} campaigns. Failing: {failing}.",
         }
-        log("manual.results", total=total, failing=failing)
+        log("manual.results", total=total, failing=failing, partial=partial)
         log("manual.finish", summary=_last_run["summary"])
 
         append_run(
             {
-                "kind": "manual",
+                "kind": "manual_partial" if partial else "manual",
                 "ts": int(dt.datetime.now(dt.timezone.utc).timestamp()),
                 "date_from": cfg.date_from,
                 "date_to": cfg.date_to,
@@ -81,33 +98,17 @@ def _run_once(cfg: AppConfig):
 
         # Telegram: ALWAYS send a summary.
         try:
-            send_message(f"Manual domain check summary: checked {total} campaigns. Failures: {failing}.")
+            if partial:
+                send_message(f"⚠️ Server restarting. Manual check stopped early: checked {total} campaigns. Failures: {failing}.")
+            else:
+                send_message(f"Manual domain check summary: checked {total} campaigns. Failures: {failing}.")
 
             if failing:
-                from .telegram import send_many
-
-                lines: list[str] = [f"🚨 Manual run failures: {failing} failing campaign(s) (checked {total})"]
-                for r in results:
-                    c = r.get("campaign", {})
-                    failed = [ch for ch in r.get("checks", []) if not ch.get("ok")]
-                    if not failed:
-                        continue
-                    lines.append(f"FAIL | {c.get('title') or 'Campaign'} | {c.get('id')} | {c.get('domain_name') or ''}")
-                    # Modify trackback_url to include sub5=test for cloaking bypass
-                    trackback_url = add_sub5_test(c.get("trackback_url"))
-                    if trackback_url:
-                        lines.append(f"  url: {trackback_url}")
-                    for ch in failed[:8]:
-                        # Modify tested_url to include sub5=test
-                        tested_url = add_sub5_test(ch.get('tested_url'))
-                        lines.append(f"  - {ch.get('kind')}: {ch.get('failure_type')} {ch.get('message')} {tested_url or ''}")
-                    lines.append("")
+                lines = failure_lines(failures, f"🚨 Manual run failures: {failing} failing campaign(s) (checked {total})")
                 send_many(lines, max_messages=MAX_TELEGRAM_MESSAGES_PER_RUN)
         except Exception as e:
             log("telegram.error", error=str(e))
     except Exception as e:
-        from .log import log
-
         log("manual.error", error=str(e), error_type=type(e).__name__)
         _last_run = {
             "time": dt.datetime.now(dt.timezone.utc).isoformat(),
@@ -117,12 +118,13 @@ def _run_once(cfg: AppConfig):
         _is_running = False
 
 
-@app.get("/", response_class=HTMLResponse)
-def index(request: Request):
-    cfg = load_config()
-    cached = load_results()
-    runs = cached.get("runs") if isinstance(cached, dict) else []
-    latest = runs[0] if isinstance(runs, list) and runs else None
+# Dashboard reads only; reused across requests until the file changes (or 2s pass).
+_dashboard_config = mtime_cached(CONFIG_PATH)(load_config)
+
+
+@mtime_cached(LATEST_SUMMARY_PATH)
+def _dashboard_latest() -> tuple[dict | None, list[dict]]:
+    latest = load_latest_summary()
 
     failing_campaigns = []
     if isinstance(latest, dict):
@@ -133,6 +135,24 @@ def index(request: Request):
             failed = [ch for ch in checks if isinstance(ch, dict) and not ch.get("ok", True)]
             if failed:
                 failing_campaigns.append({"campaign": r.get("campaign") or {}, "failed": failed})
+    return latest, failing_campaigns
+
+
+def _dashboard_etag(request: Request) -> str:
+    # Everything the page renders from, except the UTC clock line.
+    state = (file_key(LATEST_SUMMARY_PATH), file_key(CONFIG_PATH), sorted(_last_run.items()), _is_running, str(request.query_params))
+    return f'W/"{hashlib.blake2b(repr(state).encode(), digest_size=8).hexdigest()}"'
+
+
+@app.get("/", response_class=HTMLResponse)
+def index(request: Request):
+    etag = _dashboard_etag(request)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    # sync handler: FastAPI runs it in its threadpool, so the disk reads don't block the event loop
+    cfg = _dashboard_config()
+    latest, failing_campaigns = _dashboard_latest()
 
     return templates.TemplateResponse(
         "index.html",
@@ -144,6 +164,7 @@ def index(request: Request):
             "latest": latest,
             "failing_campaigns": failing_campaigns,
         },
+        headers={"ETag": etag, "Cache-Control": "private, no-cache"},
     )
 
 
@@ -178,19 +199,22 @@ def run_now():
             # already running
             return RedirectResponse(url="/?running=1", status_code=303)
         cfg = load_config()
-        t = threading.Thread(target=_run_once, args=(cfg,), daemon=True)
-        t.start()
+        # flipped here, under the lock, so a second /run can't slip in before the worker starts
+        _is_running = True
+        _manual_worker.submit(_run_once, cfg)
     return RedirectResponse(url="/", status_code=303)
 
 
 @app.post("/telegram/webhook")
-def telegram_webhook(request: dict):
+async def telegram_webhook(request: Request):
     """Webhook endpoint for Telegram updates (alternative to polling)."""
-    from .telegram_bot import handle_telegram_update
+    if not webhook_secret_ok(request.headers.get("x-telegram-bot-api-secret-token")):
+        return JSONResponse({"ok": False}, status_code=403)
     try:
-        handle_telegram_update(request)
+        update = await request.json()
+        # command handlers make blocking Telegram calls; keep them off the event loop
+        await asyncio.to_thread(handle_telegram_update, update)
         return {"ok": True}
     except Exception as e:
-        from .log import log
         log("telegram.webhook.error", error=str(e))
         return {"ok": False, "error": str(e)}
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import functools
+import queue
+import threading
+from typing import Any, Callable
+
+from .log import log
+
+# Background runners for the manual (/run) and bot (/check) checks. Callers keep their own
+# "already running" guard, so the queue never holds more than the one call in flight.
+
+
+class DaemonWorker:
+    """Runs submitted calls one at a time on a single daemon thread, started on first use.
+
+    Like ``ThreadPoolExecutor(max_workers=1)``, but the worker is a daemon, so process exit never
+    waits on a queued or running call; use :meth:`wait_idle` to give one a bounded grace period.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._queue: queue.SimpleQueue[Callable[[], Any]] = queue.SimpleQueue()
+        self._idle = threading.Condition()
+        self._pending = 0
+        self._thread: threading.Thread | None = None
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> None:
+        with self._idle:
+            self._pending += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name=self._name)
+                self._thread.start()
+        self._queue.put(functools.partial(fn, *args))
+
+    def wait_idle(self, timeout: float) -> bool:
+        """Block until nothing is queued or running, for at most ``timeout``. True if idle."""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._pending, timeout)
+
+    def _run(self) -> None:
+        while True:
+            call = self._queue.get()
+            try:
+                call()
+            except Exception as e:
+                log("worker.error", worker=self._name, error=str(e), error_type=type(e).__name__)
+            finally:
+                with self._idle:
+                    self._pending -= 1
+                    if not self._pending:
+                        self._idle.notify_all()